@@ -1,6 +1,4 @@
 from http.server import BaseHTTPRequestHandler
-import json
-import base64
 import os
 import sys
 
@@ -11,7 +9,31 @@ if os.path.exists(script_dir):
 else:
     sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
 
-from process_csv import run_matching_job
+from process_csv import read_csv_headers, run_matching_job
+
+# Prefer pybase64 (SIMD-accelerated); fall back to stdlib base64
+try:
+    from pybase64 import b64encode, b64decode
+except ImportError:
+    from base64 import b64encode, b64decode
+
+# Prefer orjson (faster, works on bytes directly); fall back to stdlib json
+try:
+    import orjson
+
+    def json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    def json_loads(data: bytes):
+        return orjson.loads(data)
+except ImportError:
+    import json
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+    def json_loads(data: bytes):
+        return json.loads(data.decode('utf-8'))
 
 
 class handler(BaseHTTPRequestHandler):
@@ -26,7 +48,7 @@ class handler(BaseHTTPRequestHandler):
             # Read request body
             content_length = int(self.headers.get('Content-Length', 0))
             body_bytes = self.rfile.read(content_length)
-            body = json.loads(body_bytes.decode('utf-8'))
+            body = json_loads(body_bytes)
             
             csv_base64 = body.get('csv_base64')
             col_a = body.get('col_a')
@@ -37,15 +59,12 @@ class handler(BaseHTTPRequestHandler):
                 return
             
             # Decode base64 CSV
-            csv_bytes = base64.b64decode(csv_base64)
+            csv_bytes = b64decode(csv_base64)
             
             # Use first 2 columns if not specified
             if not col_a or not col_b:
-                import csv
-                import io
-                text = csv_bytes.decode('utf-8-sig', errors='replace')
-                reader = csv.DictReader(io.StringIO(text))
-                headers = reader.fieldnames or []
+                # Only the header record is needed here; run_matching_job parses the body
+                headers = read_csv_headers(csv_bytes)
                 if len(headers) < 2:
                     self._send_error(400, 'CSV must have at least 2 columns')
                     return
@@ -56,7 +75,7 @@ class handler(BaseHTTPRequestHandler):
             output_bytes = run_matching_job(csv_bytes, col_a, col_b)
             
             # Encode output as base64
-            output_base64 = base64.b64encode(output_bytes).decode('utf-8')
+            output_base64 = b64encode(output_bytes).decode('utf-8')
             
             # Send success response
             self._send_response(200, {
@@ -90,7 +109,7 @@ class handler(BaseHTTPRequestHandler):
         self.send_header('Content-Type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode('utf-8'))
+        self.wfile.write(json_dumps(data))
     
     def _send_error(self, status_code, message):
         """Send an error response"""
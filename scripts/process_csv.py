@@ -7,24 +7,47 @@ This script receives a CSV file path as an argument and processes it.
 from __future__ import annotations
 
 import csv
+import glob
+import hashlib
 import io
 import os
 import re
 import sys
 import unicodedata
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple, Any, Set
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, Any, Set
 
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 
-from openai import OpenAI
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pa_compute
+    import pyarrow.csv as pa_csv
+except ImportError:  # fall back to the stdlib csv module and dict lookups
+    pa = None
+    pa_compute = None
+    pa_csv = None
+
+# openai (with httpx and pydantic) is only needed for the AI step, so it is
+# imported lazily to keep cold starts fast when every row is an exact match
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 
 # ----------------------------
 # Config
 # ----------------------------
 
+def env_int(name: str, default: int) -> int:
+    """Integer from the environment; `default` if unset or malformed."""
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
 @dataclass
 class MatchConfig:
     # Cleaning
@@ -42,6 +65,9 @@ class MatchConfig:
     # AI matching behavior
     embedding_model: str = "text-embedding-3-small"
     chunk_size: int = 100
+    embedding_max_workers: int = field(default_factory=lambda: env_int("EMBEDDING_MAX_WORKERS", 8))  # concurrent embedding requests
+    embedding_max_retries: int = 2  # retries per batch, done by the OpenAI client (capped backoff, honors Retry-After)
+    cache_ref_embeddings: bool = True  # reuse Column B embeddings when the same B list is matched again
     allow_many_to_one_ai: bool = False  # if False, AI step won't reuse B values already used (greedy one-to-one)
 
 
@@ -52,6 +78,11 @@ COMMON_SUFFIXES = {
 
 PUNCT_RE = re.compile(r"[^\w\s]", flags=re.UNICODE)
 WS_RE = re.compile(r"\s+")
+NON_WORD_RE = re.compile(r"[^\w]+", flags=re.UNICODE)  # punctuation + whitespace runs in one pass
+
+DEFAULT_EMBEDDING_DIM = 1536  # text-embedding-3-small
+SIMILARITY_CHUNK_SIZE = 1000  # A rows scored per block in the AI matcher
+GREEDY_TOP_K = 32  # candidates partitioned out per row before falling back to a full sort
 
 
 # ----------------------------
@@ -105,43 +136,122 @@ def normalize_text(s: str, cfg: MatchConfig) -> str:
     return out
 
 
+def make_normalizer(cfg: MatchConfig) -> Callable[[str], str]:
+    """
+    Returns a single-argument normalizer equivalent to normalize_text(s, cfg),
+    with the config branches resolved once up front.
+    For the default config (punctuation removal + whitespace collapsing) the
+    two regex passes are fused into one NON_WORD_RE substitution.
+    """
+    if not (cfg.remove_punctuation and cfg.collapse_whitespace):
+        return lambda s: normalize_text(s, cfg)
+
+    normalize_unicode = cfg.normalize_unicode
+    case_insensitive = cfg.case_insensitive
+    ampersand_to_and = cfg.ampersand_to_and
+    strip_common_suffixes = cfg.strip_common_suffixes
+    sub = NON_WORD_RE.sub
+
+    def normalizer(s: str) -> str:
+        if s is None:
+            return ""
+        # ASCII text is already NFKC-normalized
+        if normalize_unicode and not s.isascii():
+            s = unicodedata.normalize("NFKC", s)
+        if case_insensitive:
+            s = s.lower()
+        if ampersand_to_and:
+            s = s.replace("&", " and ")
+        s = sub(" ", s).strip()
+        if strip_common_suffixes:
+            tokens = s.split()
+            while tokens and tokens[-1] in COMMON_SUFFIXES:
+                tokens.pop()
+            s = " ".join(tokens)
+        return s
+
+    return normalizer
+
+
 def normalize_list(values: List[str], cfg: MatchConfig) -> List[str]:
-    return [normalize_text(v or "", cfg) for v in values]
+    normalizer = make_normalizer(cfg)
+    return [normalizer(v or "") for v in values]
+
+
+def normalize_and_count(values: List[str], cfg: MatchConfig) -> Tuple[List[str], int]:
+    """Normalize values and count the non-empty results, normalizing each value once."""
+    normalized = normalize_list(values, cfg)
+    return normalized, sum(1 for n in normalized if n.strip())
 
 
 # ----------------------------
 # CSV helpers
 # ----------------------------
 
-def parse_csv(csv_bytes: bytes) -> Tuple[List[Dict[str, str]], List[str]]:
-    text = csv_bytes.decode("utf-8-sig", errors="replace")
-    reader = csv.DictReader(io.StringIO(text))
-    headers = reader.fieldnames or []
-    rows = [r for r in reader]
-    return rows, headers
+def read_csv_headers(csv_bytes: bytes) -> List[str]:
+    """Read only the header record, without decoding or parsing the rest of the file."""
+    text = io.TextIOWrapper(io.BytesIO(csv_bytes), encoding="utf-8-sig", errors="replace", newline="")
+    return next(csv.reader(text), [])
+
+
+def read_match_columns(csv_bytes: bytes, col_a: str, col_b: str) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Returns (a_values, b_values, headers) for the two selected columns.
+    Uses pyarrow's columnar parser when available and falls back to a
+    single csv.reader pass if pyarrow is missing, a selected header name is
+    repeated, or pyarrow rejects the file (ragged rows, invalid UTF-8, ...).
+    Missing cells are returned as "".
+    If either column is not in the headers, both value lists are empty.
+    """
+    if pa_csv is not None:
+        headers = read_csv_headers(csv_bytes)
+        if col_a not in headers or col_b not in headers:
+            return [], [], headers
+        columns = list(dict.fromkeys([col_a, col_b]))
+        # pyarrow's include_columns takes the first of repeated header names,
+        # so those files go through the csv.reader path (last one wins)
+        if all(headers.count(c) == 1 for c in columns):
+            try:
+                table = pa_csv.read_csv(
+                    pa.BufferReader(csv_bytes),
+                    convert_options=pa_csv.ConvertOptions(
+                        include_columns=columns,
+                        column_types={c: pa.string() for c in columns},
+                    ),
+                )
+                return table.column(col_a).to_pylist(), table.column(col_b).to_pylist(), headers
+            except (pa.ArrowInvalid, KeyError):
+                pass
 
+    text = csv_bytes.decode("utf-8-sig", errors="replace")
+    reader = csv.reader(io.StringIO(text))
+    headers = next(reader, [])
+    if col_a not in headers or col_b not in headers:
+        return [], [], headers
 
-def count_non_empty(values: List[str], cfg: MatchConfig) -> int:
-    """Count non-empty values after normalization."""
-    if not values:
-        return 0
-    count = 0
-    for v in values:
-        normalized = normalize_text(v or "", cfg)
-        if normalized.strip():
-            count += 1
-    return count
+    # Last occurrence wins for repeated header names, as with DictReader
+    idx_a = len(headers) - 1 - headers[::-1].index(col_a)
+    idx_b = len(headers) - 1 - headers[::-1].index(col_b)
+    a_values: List[str] = []
+    b_values: List[str] = []
+    for row in reader:
+        if not row:
+            continue
+        a_values.append(row[idx_a] if idx_a < len(row) else "")
+        b_values.append(row[idx_b] if idx_b < len(row) else "")
+    return a_values, b_values, headers
 
 
 # ----------------------------
 # Exact matching
 # ----------------------------
 
-def build_norm_to_original_lookup(ref_original: List[str], ref_norm: List[str]) -> Dict[str, str]:
-    lookup: Dict[str, str] = {}
-    for orig, norm in zip(ref_original, ref_norm):
+def build_norm_to_index_lookup(ref_norm: List[str]) -> Dict[str, int]:
+    """Map each non-empty normalized ref value to the index of its first occurrence."""
+    lookup: Dict[str, int] = {}
+    for idx, norm in enumerate(ref_norm):
         if norm and norm not in lookup:
-            lookup[norm] = orig
+            lookup[norm] = idx
     return lookup
 
 
@@ -158,29 +268,25 @@ def exact_match_pass(
       match_quality: 1.0 for exact matches else 0.0
       used_b_indices: indices in ref_original used by exact match (for one-to-one AI behavior)
     """
-    lookup_norm_to_orig = build_norm_to_original_lookup(ref_original, ref_norm)
-
-    # To mark used indices, we also want norm->index for first occurrence
-    norm_to_index: Dict[str, int] = {}
-    for idx, norm in enumerate(ref_norm):
-        if norm and norm not in norm_to_index:
-            norm_to_index[norm] = idx
-
-    best: List[Optional[str]] = []
-    style: List[str] = []
-    quality: List[float] = []
-    used_b_indices: Set[int] = set()
-
-    for norm in source_norm:
-        if norm and norm in lookup_norm_to_orig:
-            best.append(lookup_norm_to_orig[norm])
-            style.append("non-ai-exact")
-            quality.append(1.0)
-            used_b_indices.add(norm_to_index[norm])
-        else:
-            best.append(None)
-            style.append("unmatched")  # Will be replaced by AI step
-            quality.append(0.0)
+    match_indices: List[Optional[int]]
+    if pa_compute is not None:
+        # Hash-join in Arrow: index of the first equal ref value, null if none.
+        # Empty source values never match.
+        source_arr = pa.array(source_norm, type=pa.string())
+        found = pa_compute.index_in(source_arr, value_set=pa.array(ref_norm, type=pa.string()))
+        found = pa_compute.if_else(pa_compute.equal(source_arr, ""), pa.scalar(None, found.type), found)
+        match_indices = found.to_pylist()
+    else:
+        norm_to_index = build_norm_to_index_lookup(ref_norm)
+        # One C-level dict lookup per source value; None means no exact match
+        # (empty values are never keys, so they always come back as None)
+        match_indices = list(map(norm_to_index.get, source_norm))
+
+    best: List[Optional[str]] = [None if j is None else ref_original[j] for j in match_indices]
+    style: List[str] = ["unmatched" if j is None else "non-ai-exact" for j in match_indices]  # unmatched is replaced by AI step
+    quality: List[float] = [0.0 if j is None else 1.0 for j in match_indices]
+    used_b_indices: Set[int] = set(match_indices)
+    used_b_indices.discard(None)
 
     return best, style, quality, used_b_indices
 
@@ -189,68 +295,261 @@ def exact_match_pass(
 # AI embeddings matcher (adapted from your script)
 # ----------------------------
 
+class EmbeddingCache:
+    """
+    Small LRU of (model, text) -> float32 embedding kept at module level, so
+    warm serverless invocations over overlapping values skip the API.
+    Bounded by the total bytes of the stored vectors.
+    Only touched from the calling thread, never from the embedding workers.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._nbytes = 0
+        self._entries: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+
+    def get(self, model: str, text: str) -> Optional[np.ndarray]:
+        key = (model, text)
+        emb = self._entries.get(key)
+        if emb is not None:
+            self._entries.move_to_end(key)
+        return emb
+
+    def put(self, model: str, text: str, emb: np.ndarray) -> None:
+        if emb.nbytes > self.max_bytes:
+            return
+        key = (model, text)
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._nbytes -= old.nbytes
+        self._entries[key] = emb
+        self._nbytes += emb.nbytes
+        while self._nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._nbytes -= evicted.nbytes
+
+
+# ~6 KB per entry at 1536 dims, so the default holds ~10k vectors
+_EMBEDDING_CACHE = EmbeddingCache(env_int("EMBEDDING_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+# Normalized Column B embedding matrices keyed by ref_embeddings_key().
+# Kept in memory (bounded by bytes) for warm serverless invocations and,
+# if REF_EMBEDDING_CACHE_DIR is set, on disk for the CLI, which runs in a
+# fresh process per job. Files hold embeddings of user data, so the
+# directory is created 0700 and files are written 0600.
+_REF_EMBEDDING_CACHE: "OrderedDict[str, np.ndarray]" = OrderedDict()
+REF_EMBEDDING_CACHE_MAX_BYTES = env_int("REF_EMBEDDING_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+REF_EMBEDDING_CACHE_DIR = os.environ.get("REF_EMBEDDING_CACHE_DIR", "")  # "" (default) disables the disk cache
+REF_EMBEDDING_CACHE_MAX_FILES = 8
+
+
+def ref_embeddings_key(ref_values: List[str], model: str) -> str:
+    """Content hash of the reference list (and model) used to cache its embeddings."""
+    h = hashlib.blake2b(digest_size=20)
+    # Length-prefix every field so different lists can never serialize alike
+    for value in [model, *ref_values]:
+        encoded = (value or "").encode("utf-8")
+        h.update(len(encoded).to_bytes(8, "little"))
+        h.update(encoded)
+    return h.hexdigest()
+
+
+def load_ref_embeddings(key: str) -> Optional[np.ndarray]:
+    """Cached normalized B embeddings (read-only), or None on a miss."""
+    emb = _REF_EMBEDDING_CACHE.get(key)
+    if emb is not None:
+        _REF_EMBEDDING_CACHE.move_to_end(key)
+        return emb
+    if not REF_EMBEDDING_CACHE_DIR:
+        return None
+    path = os.path.join(REF_EMBEDDING_CACHE_DIR, f"ref_emb_{key}.npy")
+    try:
+        emb = np.load(path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    store_ref_embeddings(key, emb, persist=False)
+    return emb
+
+
+def store_ref_embeddings(key: str, emb: np.ndarray, persist: bool = True) -> None:
+    # Evict least recently used matrices until the new one fits the byte budget
+    if emb.nbytes <= REF_EMBEDDING_CACHE_MAX_BYTES:
+        _REF_EMBEDDING_CACHE.pop(key, None)
+        while _REF_EMBEDDING_CACHE and (
+            sum(e.nbytes for e in _REF_EMBEDDING_CACHE.values()) + emb.nbytes > REF_EMBEDDING_CACHE_MAX_BYTES
+        ):
+            _REF_EMBEDDING_CACHE.popitem(last=False)
+        _REF_EMBEDDING_CACHE[key] = emb
+    if not persist or not REF_EMBEDDING_CACHE_DIR:
+        return
+    # Write to a temp name and rename so concurrent readers never see a partial file
+    path = os.path.join(REF_EMBEDDING_CACHE_DIR, f"ref_emb_{key}.npy")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(REF_EMBEDDING_CACHE_DIR, mode=0o700, exist_ok=True)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, emb)
+        os.replace(tmp_path, path)
+        # Keep only the most recently written files
+        files = sorted(glob.glob(os.path.join(REF_EMBEDDING_CACHE_DIR, "ref_emb_*.npy")), key=os.path.getmtime)
+        for old_path in files[:-REF_EMBEDDING_CACHE_MAX_FILES]:
+            os.remove(old_path)
+    except OSError:
+        # The disk cache is best-effort; the in-memory copy is still used
+        pass
+    finally:
+        # Don't leave partial files behind (e.g. ENOSPC during np.save)
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+_CLIENT: Optional[OpenAI] = None
+_CLIENT_API_KEY: Optional[str] = None
+
+
+def get_openai_client(api_key: str) -> OpenAI:
+    """Reuse one client (and its HTTP connection pool) across warm invocations."""
+    from openai import OpenAI
+
+    global _CLIENT, _CLIENT_API_KEY
+    if _CLIENT is None or _CLIENT_API_KEY != api_key:
+        _CLIENT = OpenAI(api_key=api_key)
+        _CLIENT_API_KEY = api_key
+    return _CLIENT
+
+
 def chunk_list(lst: List[str], chunk_size: int):
     for i in range(0, len(lst), chunk_size):
         yield lst[i:i + chunk_size]
 
 
-def get_embeddings_for_list(client: OpenAI, texts: List[str], model: str, chunk_size: int) -> List[List[float]]:
+def embed_chunk(client: OpenAI, chunk: List[str], model: str) -> List[List[float]]:
+    resp = client.embeddings.create(input=chunk, model=model)
+    return [d.embedding for d in resp.data]
+
+
+def get_embeddings_for_list(
+    client: OpenAI,
+    texts: List[str],
+    model: str,
+    chunk_size: int,
+    max_workers: int = 8,
+    max_retries: int = 2,
+    update_cache: bool = True,
+) -> np.ndarray:
     """
-    Returns embeddings aligned with `texts`.
+    Returns a float32 array of shape (len(texts), dim) with embeddings aligned with `texts`.
     Filters out empty strings and None values before sending to API.
+    Duplicate strings are sent only once and share the same embedding.
+    Batches are requested concurrently on up to `max_workers` threads, and
+    strings embedded by earlier calls are served from a module-level LRU
+    (newly fetched vectors are added to it unless `update_cache` is False).
+    Rate limits and transient errors are retried up to `max_retries` times
+    by the OpenAI client itself, with its own capped backoff.
     For empty strings, returns a zero vector embedding.
     Raises if API fails (so your route can return a clean error).
     """
     if not texts:
-        return []
+        return np.zeros((0, DEFAULT_EMBEDDING_DIM), dtype=np.float32)
     
-    # Filter out empty strings and None values, but track their positions
-    non_empty_texts: List[str] = []
-    non_empty_indices: List[int] = []
-    empty_indices: List[int] = []
+    # Filter out empty strings and None values, and deduplicate so each
+    # distinct string is embedded only once.
+    # uniq preserves first-seen order; value is the row in unique_embeddings.
+    # text_rows[i] is the unique row for texts[i], or -1 if it is empty.
+    uniq: Dict[str, int] = {}
+    text_rows = np.full(len(texts), -1, dtype=np.intp)
     
     for i, text in enumerate(texts):
         if text and text.strip():
-            non_empty_texts.append(text)
-            non_empty_indices.append(i)
-        else:
-            empty_indices.append(i)
-    
-    # Get embeddings for non-empty texts
-    all_embeddings: List[List[float]] = []
-    if non_empty_texts:
-        total_chunks = (len(non_empty_texts) + chunk_size - 1) // chunk_size
-        chunk_num = 0
-        for chunk in chunk_list(non_empty_texts, chunk_size):
-            chunk_num += 1
-            # Filter out any empty strings from chunk (safety check)
-            filtered_chunk = [t for t in chunk if t and t.strip()]
-            if not filtered_chunk:
-                continue
-            log_progress("embedding", f"Getting embeddings batch {chunk_num}/{total_chunks} ({len(all_embeddings)}/{len(non_empty_texts)} values)")
-            resp = client.embeddings.create(input=filtered_chunk, model=model)
-            all_embeddings.extend([d.embedding for d in resp.data])
-    
-    # Create result list aligned with original texts
-    # Get embedding dimension from first embedding (if available)
-    embedding_dim = len(all_embeddings[0]) if all_embeddings else 1536  # default for text-embedding-3-small
-    result_embeddings: List[List[float]] = []
-    
-    # Build result list maintaining original order
-    non_empty_emb_idx = 0
-    for i in range(len(texts)):
-        if i in empty_indices:
-            # Use zero vector for empty texts
-            zero_vector = [0.0] * embedding_dim
-            result_embeddings.append(zero_vector)
-        else:
-            # Use the corresponding embedding
-            result_embeddings.append(all_embeddings[non_empty_emb_idx])
-            non_empty_emb_idx += 1
+            row = uniq.get(text)
+            if row is None:
+                row = uniq[text] = len(uniq)
+            text_rows[i] = row
+    unique_texts = list(uniq.keys())
+    
+    # Reuse embeddings cached by earlier calls; only the rest go to the API
+    unique_embeddings: Optional[np.ndarray] = None
+    missing_rows: List[int] = []
+    for row, text in enumerate(unique_texts):
+        cached = _EMBEDDING_CACHE.get(model, text)
+        if cached is None:
+            missing_rows.append(row)
+            continue
+        if unique_embeddings is None:
+            unique_embeddings = np.empty((len(unique_texts), len(cached)), dtype=np.float32)
+        unique_embeddings[row] = cached
+    if len(missing_rows) < len(unique_texts):
+        log_progress("embedding", f"Reusing {len(unique_texts) - len(missing_rows)} cached embeddings")
+    
+    # Get embeddings for the remaining unique texts, batches in parallel,
+    # written straight into one packed float32 array
+    if missing_rows:
+        missing_texts = [unique_texts[row] for row in missing_rows]
+        chunks = list(chunk_list(missing_texts, chunk_size))
+        total_chunks = len(chunks)
+        log_progress("embedding", f"Getting embeddings in {total_chunks} batches ({len(missing_texts)} unique values)")
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total_chunks))) as executor:
+            # map() yields results in submission order
+            retrying_client = client.with_options(max_retries=max_retries)
+            batches = executor.map(lambda c: embed_chunk(retrying_client, c, model), chunks)
+            start = 0
+            for chunk_num, embeddings in enumerate(batches, start=1):
+                batch = np.asarray(embeddings, dtype=np.float32)
+                if unique_embeddings is None:
+                    # Dimension is only known once the first batch comes back
+                    unique_embeddings = np.empty((len(unique_texts), batch.shape[1]), dtype=np.float32)
+                rows = missing_rows[start:start + len(batch)]
+                unique_embeddings[rows] = batch
+                if update_cache:
+                    for row, emb in zip(rows, batch):
+                        _EMBEDDING_CACHE.put(model, unique_texts[row], emb.copy())
+                start += len(batch)
+                log_progress("embedding", f"Got embeddings batch {chunk_num}/{total_chunks} ({start}/{len(missing_texts)} unique values)")
+    
+    # Create result array aligned with original texts
+    # Get embedding dimension from first batch (if available)
+    embedding_dim = unique_embeddings.shape[1] if unique_embeddings is not None else DEFAULT_EMBEDDING_DIM
+    # Rows for empty texts stay as zero vectors
+    result_embeddings = np.zeros((len(texts), embedding_dim), dtype=np.float32)
+    
+    # Scatter unique embeddings to every original position in one gather
+    # (duplicates share a unique row)
+    is_non_empty = text_rows >= 0
+    if unique_embeddings is not None:
+        result_embeddings[is_non_empty] = unique_embeddings[text_rows[is_non_empty]]
     
     return result_embeddings
 
 
+def first_unused(row_order, used: Set[int]) -> int:
+    """First B index in best-first `row_order` not in `used`, or -1 if all are used."""
+    for j in row_order:
+        if j >= 0 and j not in used:
+            return int(j)
+    return -1
+
+
+def best_unused(scores: np.ndarray, used: Set[int], top_k: int = GREEDY_TOP_K) -> int:
+    """
+    Index of the highest score not in `used` (lowest index on ties, like
+    argmax), or -1 if every index is used.
+    Only the top_k entries are partitioned out and sorted; the full row is
+    sorted only when all of them are used, or when the pick ties with the
+    cut-off score (a lower tied index could lie outside the top_k).
+    """
+    n = len(scores)
+    if top_k < n:
+        top = np.argpartition(scores, n - top_k)[n - top_k:]
+        top = top[np.lexsort((top, -scores[top]))]
+        max_idx = first_unused(top, used)
+        if max_idx >= 0 and scores[max_idx] > scores[top[-1]]:
+            return max_idx
+    return first_unused(np.argsort(-scores, kind="stable"), used)
+
+
 def ai_match_batch_embeddings(
     client: OpenAI,
     unmatched_sources_original: List[str],
@@ -269,23 +568,42 @@ def ai_match_batch_embeddings(
 
     # Embed Column A (unmatched values)
     log_progress("ai_embedding_a", f"Getting embeddings for Column A ({len(unmatched_sources_original)} values)...", 40)
-    emb_a = get_embeddings_for_list(client, unmatched_sources_original, cfg.embedding_model, cfg.chunk_size)
+    emb_a_np = get_embeddings_for_list(
+        client, unmatched_sources_original, cfg.embedding_model, cfg.chunk_size,
+        max_workers=cfg.embedding_max_workers, max_retries=cfg.embedding_max_retries,
+    )
     
-    # Embed Column B (reference values)
-    log_progress("ai_embedding_b", f"Getting embeddings for Column B ({len(ref_values_original)} values)...", 60)
-    emb_b = get_embeddings_for_list(client, ref_values_original, cfg.embedding_model, cfg.chunk_size)
+    # Embed Column B (reference values), reusing the matrix from an earlier
+    # job against the same B list when there is one
+    ref_key = ref_embeddings_key(ref_values_original, cfg.embedding_model) if cfg.cache_ref_embeddings else None
+    emb_b_np = load_ref_embeddings(ref_key) if ref_key else None
+    if emb_b_np is not None:
+        log_progress("ai_embedding_b", f"Reusing cached embeddings for Column B ({len(ref_values_original)} values)", 60)
+    else:
+        log_progress("ai_embedding_b", f"Getting embeddings for Column B ({len(ref_values_original)} values)...", 60)
+        emb_b_np = get_embeddings_for_list(
+            client, ref_values_original, cfg.embedding_model, cfg.chunk_size,
+            max_workers=cfg.embedding_max_workers, max_retries=cfg.embedding_max_retries,
+            # B is kept whole in the matrix cache; don't store its vectors twice
+            update_cache=not ref_key,
+        )
+        emb_b_np /= np.linalg.norm(emb_b_np, axis=1, keepdims=True).clip(min=1e-12)
+        if ref_key:
+            store_ref_embeddings(ref_key, emb_b_np)
 
     log_progress("similarity", f"Computing similarity matrix ({len(unmatched_sources_original)} x {len(ref_values_original)})...", 80)
-    emb_a_np = np.array(emb_a, dtype=np.float32)
-    emb_b_np = np.array(emb_b, dtype=np.float32)
+    # L2-normalize once so cosine similarity is a plain dot product
+    # (zero vectors for empty values stay zero thanks to the clip;
+    # B is normalized above, before it is cached)
+    emb_a_np /= np.linalg.norm(emb_a_np, axis=1, keepdims=True).clip(min=1e-12)
 
     results: List[Dict[str, Any]] = []
     local_used: Set[int] = set(used_b_indices)  # don't reuse B that exact-match already consumed
 
     # Compute similarity matrix in chunks to avoid memory issues
     # For 40k x 40k at float32, full matrix would be ~6GB - too much
-    # Use chunks of 1000 rows at a time
-    CHUNK_SIZE = 1000
+    # Use chunks of SIMILARITY_CHUNK_SIZE rows at a time
+    CHUNK_SIZE = SIMILARITY_CHUNK_SIZE
     num_chunks = (len(unmatched_sources_original) + CHUNK_SIZE - 1) // CHUNK_SIZE
     
     log_progress("matching", f"Finding best matches for {len(unmatched_sources_original)} values...", 85)
@@ -296,44 +614,38 @@ def ai_match_batch_embeddings(
         
         # Compute similarities for this chunk all at once (vectorized)
         chunk_emb_a = emb_a_np[start_idx:end_idx]
-        chunk_similarities = cosine_similarity(chunk_emb_a, emb_b_np)  # shape: (chunk_size, len(B))
+        chunk_similarities = chunk_emb_a @ emb_b_np.T  # shape: (chunk_size, len(B))
         
         # Update progress
         pct = 85 + int(5 * end_idx / len(unmatched_sources_original))
         log_progress("matching", f"Matched {end_idx}/{len(unmatched_sources_original)} values...", pct)
         
+        if cfg.allow_many_to_one_ai:
+            # Many-to-one allowed, just use best match for every row at once
+            best_indices = chunk_similarities.argmax(axis=1)
+            for local_i, max_idx in enumerate(best_indices.tolist()):
+                results.append({
+                    "best_match": ref_values_original[max_idx],
+                    "match_quality": float(chunk_similarities[local_i, max_idx]),
+                    "b_index": max_idx
+                })
+            continue
+
         # Process each row in the chunk
         for local_i, scores in enumerate(chunk_similarities):
-            i = start_idx + local_i
-            
-            if not cfg.allow_many_to_one_ai:
-                # Try to find the best unused match first
-                unused_scores = scores.copy()
-                for j in local_used:
-                    unused_scores[j] = -1.0
-                
-                if np.max(unused_scores) > -1.0:
-                    # Found an unused match
-                    max_idx = int(np.argmax(unused_scores))
-                    best_score = float(unused_scores[max_idx])
-                else:
-                    # All B values are used, fallback to best match overall (allow reuse)
-                    max_idx = int(np.argmax(scores))
-                    best_score = float(scores[max_idx])
-            else:
-                # Many-to-one allowed, just use best match
+            # Take the best unused B, looking at the top few candidates first
+            max_idx = best_unused(scores, local_used)
+            if max_idx < 0:
+                # All B values are used, fallback to best match overall (allow reuse)
                 max_idx = int(np.argmax(scores))
-                best_score = float(scores[max_idx])
 
             # Always assign a match (no threshold check)
             results.append({
                 "best_match": ref_values_original[max_idx],
-                "match_quality": best_score,
+                "match_quality": float(chunk_similarities[local_i, max_idx]),
                 "b_index": max_idx
             })
-            
-            if not cfg.allow_many_to_one_ai:
-                local_used.add(max_idx)
+            local_used.add(max_idx)
 
     return results
 
@@ -351,37 +663,33 @@ def run_matching_job(
     cfg = cfg or MatchConfig()
 
     log_progress("parsing", "Parsing CSV file...", 5)
-    rows, headers = parse_csv(csv_bytes)
+    # Originals preserved
+    a_original, b_original, headers = read_match_columns(csv_bytes, col_a, col_b)
     if col_a not in headers or col_b not in headers:
         raise ValueError(f"CSV must contain selected columns: {col_a}, {col_b}")
+    n_rows = len(a_original)
     
-    log_progress("parsing", f"Parsed {len(rows)} rows with columns: {col_a}, {col_b}", 10)
+    log_progress("parsing", f"Parsed {n_rows} rows with columns: {col_a}, {col_b}", 10)
 
-    # Originals preserved
-    a_original = [(r.get(col_a, "") or "") for r in rows]
-    b_original = [(r.get(col_b, "") or "") for r in rows]
+    # Normalized keys for matching only (counts feed the swap rule below)
+    log_progress("normalizing", "Normalizing text values...", 15)
+    a_norm, count_a = normalize_and_count(a_original, cfg)
+    b_norm, count_b = normalize_and_count(b_original, cfg)
 
     # Swap columns based on row count (non-empty values)
     # Ensure Column A is the shorter list by number of non-empty values
     swapped = False
-    if cfg.allow_swap_columns_by_row_count:
-        count_a = count_non_empty(a_original, cfg)
-        count_b = count_non_empty(b_original, cfg)
-        if count_a > count_b:
-            a_original, b_original = b_original, a_original
-            col_a, col_b = col_b, col_a
-            swapped = True
-
-    # Normalized keys for matching only
-    log_progress("normalizing", "Normalizing text values...", 15)
-    a_norm = normalize_list(a_original, cfg)
-    b_norm = normalize_list(b_original, cfg)
+    if cfg.allow_swap_columns_by_row_count and count_a > count_b:
+        a_original, b_original = b_original, a_original
+        a_norm, b_norm = b_norm, a_norm
+        col_a, col_b = col_b, col_a
+        swapped = True
 
     # Initialize result arrays
-    best_match: List[Optional[str]] = [None] * len(rows)
-    match_style: List[str] = [""] * len(rows)
-    match_quality: List[float] = [0.0] * len(rows)
-    is_duplicate: List[bool] = [False] * len(rows)
+    best_match: List[Optional[str]] = [None] * n_rows
+    match_style: List[str] = [""] * n_rows
+    match_quality: List[float] = [0.0] * n_rows
+    is_duplicate: List[bool] = [False] * n_rows
     
     # Track duplicates in Column A - map normalized value to first occurrence index
     # Also track matches for duplicates: norm_value -> (best_match, match_style, match_quality)
@@ -449,7 +757,7 @@ def run_matching_job(
         if not api_key:
             raise RuntimeError("Missing OPENAI_API_KEY environment variable")
 
-        client = OpenAI(api_key=api_key)
+        client = get_openai_client(api_key)
 
         log_progress("ai_embedding", f"Starting AI embedding process (this is the longest step)...", 35)
         ai_results = ai_match_batch_embeddings(
@@ -526,27 +834,32 @@ def run_matching_job(
         "columns_swapped",
     ]
 
-    out = io.StringIO()
-    writer = csv.DictWriter(out, fieldnames=out_headers)
-    writer.writeheader()
-
-    for i in range(len(rows)):
-        # Determine match status based on quality threshold
-        match_status = "MATCHED" if match_quality[i] > 0.75 else "REVIEW"
-        
-        writer.writerow({
-            col_a: a_original[i],
-            col_b: b_original[i],
-            best_match_col: best_match[i] or "",
-            "match_style": match_style[i],
-            "match_quality": match_quality[i],
-            "match_status": match_status,
-            "duplicate": "TRUE" if is_duplicate[i] else "FALSE",
-            "columns_swapped": "true" if swapped else "false",
-        })
+    # Encode rows into a single bytes buffer as they are written, rather than
+    # building a str and encoding a second full copy at the end
+    out = io.TextIOWrapper(io.BytesIO(), encoding="utf-8", newline="", write_through=True)
+    writer = csv.writer(out)
+    writer.writerow(out_headers)
+
+    # One tuple per row, in out_headers order, streamed straight into the
+    # C writer; match status is based on a quality threshold
+    swapped_str = "true" if swapped else "false"
+    writer.writerows(
+        (
+            a_original[i],
+            b_original[i],
+            best_match[i] or "",
+            match_style[i],
+            match_quality[i],
+            "MATCHED" if match_quality[i] > 0.75 else "REVIEW",
+            "TRUE" if is_duplicate[i] else "FALSE",
+            swapped_str,
+        )
+        for i in range(n_rows)
+    )
 
-    log_progress("finalizing", f"Finalizing output ({len(rows)} rows)...", 99)
-    return out.getvalue().encode("utf-8")
+    log_progress("finalizing", f"Finalizing output ({n_rows} rows)...", 99)
+    out.flush()
+    return out.detach().getvalue()
 
 
 def process_csv(csv_file_path: str, output_file_path: str):
@@ -561,8 +874,8 @@ def process_csv(csv_file_path: str, output_file_path: str):
     with open(csv_file_path, 'rb') as f:
         csv_bytes = f.read()
     
-    # Parse to get headers
-    rows, headers = parse_csv(csv_bytes)
+    # Read just the header row; run_matching_job parses the body
+    headers = read_csv_headers(csv_bytes)
     
     if len(headers) < 2:
         raise ValueError("CSV must have at least 2 columns")